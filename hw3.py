@@ -9,138 +9,266 @@ Usage examples:
   python hw3.py teardown --region us-west-1 --prefix fang
 """
 
-import argparse, json, sys
+import argparse, json, sys, threading, time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache, partial
 from pathlib import Path
-import boto3
-from botocore.exceptions import ClientError
+# boto3/botocore are imported inside the functions that use them: importing
+# them costs a few hundred ms, which `--help` and argument errors shouldn't pay.
+
+try:
+    import orjson  # optional: much faster than json.dump(indent=2, default=str)
+except ImportError:
+    orjson = None
 
 def write_json(path, obj):
+    if orjson is not None:
+        # Pass datetimes through to default=str so both paths write the same
+        # "2025-10-02 07:19:41+00:00" format as the json.dump fallback.
+        Path(path).write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME,
+                                            default=str))
+        return
     with open(path, "w") as f:
         json.dump(obj, f, indent=2, default=str)
 
-import time
-
-def tag_name(ec2, resource_id, name, retries=5):
-    """Tag any EC2/VPC resource with Name=<name>, with light retry for eventual consistency."""
-    for attempt in range(retries):
+MAX_ATTEMPTS = 8
+
+# Shared by every client. The thread pools here run up to 16 calls at once, more
+# than botocore's default pool of 10 connections; a larger pool plus TCP
+# keepalive lets each cached client keep its TLS connections warm and reuse
+# them across every call in create()/teardown().
+CLIENT_CONFIG = dict(retries={"max_attempts": MAX_ATTEMPTS, "mode": "standard"},
+                     max_pool_connections=50, tcp_keepalive=True)
+
+@lru_cache(maxsize=None)
+def ec2_client(region):
+    """EC2 client with standard retries, built once per region."""
+    import boto3
+    from botocore.config import Config
+    return boto3.client("ec2", region_name=region, config=Config(**CLIENT_CONFIG))
+
+@lru_cache(maxsize=None)
+def sts_client(region):
+    """STS client, built once per region."""
+    import boto3
+    from botocore.config import Config
+    return boto3.client("sts", region_name=region, config=Config(**CLIENT_CONFIG))
+
+@lru_cache(maxsize=None)
+def resolve_vpc_id(region, prefix):
+    """VPC ID tagged Name=<prefix>-vpc, memoized per process.
+
+    Raises LookupError when there is none; lru_cache never caches exceptions,
+    so a miss is looked up again next time.
+    """
+    vpcs = ec2_client(region).describe_vpcs(Filters=[{"Name": "tag:Name", "Values": [f"{prefix}-vpc"]}])["Vpcs"]
+    if not vpcs:
+        raise LookupError(f"{prefix}-vpc")
+    return vpcs[0]["VpcId"]
+
+# Teardown error codes that just mean "already deleted" (e.g. on a re-run).
+GONE_CODES = frozenset({
+    "InvalidInstanceID.NotFound",
+    "NatGatewayNotFound",
+    "InvalidNatGatewayID.NotFound",
+    "InvalidAssociationID.NotFound",
+    "InvalidAllocationID.NotFound",
+    "InvalidInternetGatewayID.NotFound",
+    "Gateway.NotAttached",
+    "InvalidRouteTableID.NotFound",
+    "InvalidRoute.NotFound",
+    "InvalidAttachmentID.NotFound",
+    "InvalidNetworkInterfaceID.NotFound",
+    "InvalidSubnetID.NotFound",
+    "InvalidGroup.NotFound",
+    "InvalidVpcID.NotFound",
+})
+
+def safe(fn):
+    """Wrap fn so an AWS or botocore error (ClientError, connection/timeout,
+    WaiterError, ...) comes back as the exception instead of raising.
+
+    Anything else (TypeError from bad kwargs, KeyError, ...) is a bug and still raises.
+    """
+    from botocore.exceptions import BotoCoreError, ClientError
+    def _w(*a, **kw):
         try:
-            ec2.create_tags(Resources=[resource_id], Tags=[{"Key": "Name", "Value": name}])
-            return
-        except ClientError as e:
-            code = e.response.get("Error", {}).get("Code", "")
-            # Sometimes the ID isn’t immediately taggable right after creation.
-            if code in {
-                "InvalidVpcID.NotFound",
-                "InvalidSubnetID.NotFound",
-                "InvalidRouteTableID.NotFound",
-                "InvalidInternetGatewayID.NotFound",
-                "InvalidGroup.NotFound",
-                "InvalidNatGatewayID.NotFound",
-            } and attempt < retries - 1:
-                time.sleep(1 + attempt)  # backoff and retry
-                continue
-            raise
+            return fn(*a, **kw)
+        except (ClientError, BotoCoreError) as e:
+            return e
+    return _w
+
+def describe_all(ec2, op, key, **kw):
+    """Items under <key> from every page of a Describe call, so big VPCs aren't truncated."""
+    return [item for page in ec2.get_paginator(op).paginate(**kw) for item in page[key]]
+
+def tagspec(resource_type, name):
+    """TagSpecifications that name a resource in the same call that creates it."""
+    return [{"ResourceType": resource_type, "Tags": [{"Key": "Name", "Value": name}]}]
+
+
+# Fixed request pieces for create(), built once at import.
+AMI = "ami-0b09bf4b909f29738"
+USER_DATA = "#!/bin/bash\nyum update -y\n"
+SSH_INGRESS = [{"IpProtocol": "tcp", "FromPort": 22, "ToPort": 22, "IpRanges": [{"CidrIp": "0.0.0.0/0"}]}]
+BASE_RUN = {"ImageId": AMI, "InstanceType": "t3.micro", "MinCount": 1, "MaxCount": 1, "UserData": USER_DATA}
 
 
 # ---------------- CREATE ----------------
 def create(args):
+    from botocore.exceptions import ClientError
     region = args.region
     prefix = args.prefix
     key_name = args.key_name or "ff-test"
 
-    ec2 = boto3.client("ec2", region_name=region)
+    ec2 = ec2_client(region)
+
+    # Resources are named via TagSpecifications on the creating call, which saves
+    # a CreateTags round-trip each and cannot race the new ID's propagation
+    # (so no NotFound retries are needed).
 
     # 1. Create VPC
-    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
-    tag_name(ec2, vpc_id, f"{prefix}-vpc")
+    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16",
+                            TagSpecifications=tagspec("vpc", f"{prefix}-vpc"))["Vpc"]["VpcId"]
     print("VPC:", vpc_id)
 
-    # 2. Create Subnets
-    pub_subnet = ec2.create_subnet(VpcId=vpc_id, CidrBlock="10.0.1.0/24", AvailabilityZone=f"{region}a")["Subnet"]["SubnetId"]
-    tag_name(ec2, pub_subnet, f"{prefix}-public-subnet")
-
-    pri_subnet = ec2.create_subnet(VpcId=vpc_id, CidrBlock="10.0.2.0/24", AvailabilityZone=f"{region}c")["Subnet"]["SubnetId"]
-    tag_name(ec2, pri_subnet, f"{prefix}-private-subnet")
-    print("Subnets:", pub_subnet, pri_subnet)
-
-    # Enable auto-assign public IP on public subnet
-    ec2.modify_subnet_attribute(SubnetId=pub_subnet, MapPublicIpOnLaunch={'Value': True})
-
-    # 3. Create IGW
-    igw_id = ec2.create_internet_gateway()["InternetGateway"]["InternetGatewayId"]
-    ec2.attach_internet_gateway(InternetGatewayId=igw_id, VpcId=vpc_id)
-    tag_name(ec2, igw_id, f"{prefix}-igw")
-    print("IGW:", igw_id)
-
-    # 4. Allocate EIP + NAT GW
-    alloc_id = ec2.allocate_address(Domain="vpc")["AllocationId"]
-    nat_gw_id = ec2.create_nat_gateway(SubnetId=pub_subnet, AllocationId=alloc_id)["NatGateway"]["NatGatewayId"]
-    tag_name(ec2, nat_gw_id, f"{prefix}-natgw")
-    print("NATGW:", nat_gw_id)
-
-    waiter = ec2.get_waiter("nat_gateway_available")
-    waiter.wait(NatGatewayIds=[nat_gw_id])
-
-    # 5. Route Tables
-    # Find main RTB
-    rts = ec2.describe_route_tables(Filters=[{'Name':'vpc-id','Values':[vpc_id]}])['RouteTables']
-    main_rtb = next(rt['RouteTableId'] for rt in rts if any(a.get('Main') for a in rt.get('Associations', [])))
-
-    # Use main RTB as public
-    tag_name(ec2, main_rtb, f"{prefix}-main-RTB")
-    ec2.associate_route_table(RouteTableId=main_rtb, SubnetId=pub_subnet)
+    # Everything below only depends on the VPC, so issue the calls concurrently.
+    # A single low-level client is thread-safe; only Session objects are not.
+    ex = ThreadPoolExecutor(max_workers=8)
+    stop = threading.Event()  # set on the way out so the NAT poller never outlives create()
     try:
-        ec2.create_route(RouteTableId=main_rtb, DestinationCidrBlock="0.0.0.0/0", GatewayId=igw_id)
-    except ClientError:
-        pass
-
-    # Private RTB
-    rtb_pri = ec2.create_route_table(VpcId=vpc_id)["RouteTable"]["RouteTableId"]
-    tag_name(ec2, rtb_pri, f"{prefix}-rtb-private")
-    ec2.associate_route_table(RouteTableId=rtb_pri, SubnetId=pri_subnet)
-    try:
-        ec2.create_route(RouteTableId=rtb_pri, DestinationCidrBlock="0.0.0.0/0", NatGatewayId=nat_gw_id)
-    except ClientError:
-        pass
-
-    print("RouteTables:", main_rtb, rtb_pri)
-
-    # 6. Security Groups
-    sg_pub = ec2.create_security_group(GroupName=f"{prefix}-sg-public", Description="Public SG", VpcId=vpc_id)["GroupId"]
-    ec2.authorize_security_group_ingress(GroupId=sg_pub, IpPermissions=[{
-        "IpProtocol": "tcp", "FromPort": 22, "ToPort": 22,
-        "IpRanges": [{"CidrIp": "0.0.0.0/0"}]
-    }])
-    print("SecurityGroup Public:", sg_pub)
-
-    sg_pri = ec2.create_security_group(GroupName=f"{prefix}-sg-private", Description="Private SG", VpcId=vpc_id)["GroupId"]
-    ec2.authorize_security_group_ingress(GroupId=sg_pri, IpPermissions=[{
-        "IpProtocol": "tcp", "FromPort": 22, "ToPort": 22,
-        "UserIdGroupPairs": [{"GroupId": sg_pub}]
-    }])
-    print("SecurityGroup Private:", sg_pri)
-
-    # 7. Launch EC2 instances
-    ami = "ami-0b09bf4b909f29738"  # AMI
-    ud = """#!/bin/bash
-    yum update -y
-    """
-
-    # Public EC2
-    pub_run = ec2.run_instances(
-        ImageId=ami, InstanceType="t3.micro", MinCount=1, MaxCount=1,
-        KeyName=key_name, SubnetId=pub_subnet, SecurityGroupIds=[sg_pub],
-        TagSpecifications=[{'ResourceType':'instance','Tags':[{'Key':'Name','Value':f'{prefix}-ec2-public'}]}],
-        UserData=ud
-    )["Instances"][0]
-
-    # Private EC2
-    pri_run = ec2.run_instances(
-        ImageId=ami, InstanceType="t3.micro", MinCount=1, MaxCount=1,
-        KeyName=key_name, SubnetId=pri_subnet, SecurityGroupIds=[sg_pri],
-        TagSpecifications=[{'ResourceType':'instance','Tags':[{'Key':'Name','Value':f'{prefix}-ec2-private'}]}],
-        UserData=ud
-    )["Instances"][0]
+        f_pub_subnet = ex.submit(ec2.create_subnet, VpcId=vpc_id, CidrBlock="10.0.1.0/24",
+                                 AvailabilityZone=f"{region}a",
+                                 TagSpecifications=tagspec("subnet", f"{prefix}-public-subnet"))
+        f_pri_subnet = ex.submit(ec2.create_subnet, VpcId=vpc_id, CidrBlock="10.0.2.0/24",
+                                 AvailabilityZone=f"{region}c",
+                                 TagSpecifications=tagspec("subnet", f"{prefix}-private-subnet"))
+        f_igw = ex.submit(ec2.create_internet_gateway,
+                          TagSpecifications=tagspec("internet-gateway", f"{prefix}-igw"))
+        f_sg_pub = ex.submit(ec2.create_security_group,
+                             GroupName=f"{prefix}-sg-public", Description="Public SG", VpcId=vpc_id,
+                             TagSpecifications=tagspec("security-group", f"{prefix}-sg-public"))
+        f_sg_pri = ex.submit(ec2.create_security_group,
+                             GroupName=f"{prefix}-sg-private", Description="Private SG", VpcId=vpc_id,
+                             TagSpecifications=tagspec("security-group", f"{prefix}-sg-private"))
+
+        pub_subnet = f_pub_subnet.result()["Subnet"]["SubnetId"]
+        pri_subnet = f_pri_subnet.result()["Subnet"]["SubnetId"]
+        igw_id = f_igw.result()["InternetGateway"]["InternetGatewayId"]
+        sg_pub = f_sg_pub.result()["GroupId"]
+        sg_pri = f_sg_pri.result()["GroupId"]
+
+        # Find main RTB (created together with the VPC). A brand-new VPC's main RTB
+        # can take a moment to show up in Describe, so retry briefly. This runs before
+        # the EIP is allocated and the NAT GW created, so failing here leaves nothing
+        # billed by the hour behind.
+        main_rtb = None
+        for attempt in range(10):
+            rts = ec2.describe_route_tables(Filters=[{'Name':'vpc-id','Values':[vpc_id]},
+                                                     {'Name':'association.main','Values':['true']}])['RouteTables']
+            main_rtb = next((rt['RouteTableId'] for rt in rts), None)
+            if main_rtb:
+                break
+            time.sleep(1 + attempt)
+        if main_rtb is None:
+            raise SystemExit(f"Main route table of {vpc_id} not visible yet; run teardown and retry create.")
+
+        # 2. Subnets
+        print("Subnets:", pub_subnet, pri_subnet)
+
+        # Enable auto-assign public IP on public subnet
+        ec2.modify_subnet_attribute(SubnetId=pub_subnet, MapPublicIpOnLaunch={'Value': True})
+
+        # 3. Attach IGW
+        ec2.attach_internet_gateway(InternetGatewayId=igw_id, VpcId=vpc_id)
+        print("IGW:", igw_id)
+
+        # 4. Allocate EIP + NAT GW (kept late: both bill by the hour until torn down)
+        alloc_id = ec2.allocate_address(Domain="vpc",
+                                        TagSpecifications=tagspec("elastic-ip", f"{prefix}-eip"))["AllocationId"]
+        nat_gw_id = ec2.create_nat_gateway(SubnetId=pub_subnet, AllocationId=alloc_id,
+                                           TagSpecifications=tagspec("natgateway", f"{prefix}-natgw"))["NatGateway"]["NatGatewayId"]
+        print("NATGW:", nat_gw_id)
+
+        # The NAT GW takes a minute or so to come up; wait for it in the background and
+        # only join right before the steps that need it (private route + private EC2).
+        # Poll every 5s instead of the waiter's default 15s (same 10-minute budget) so
+        # we don't oversleep by up to 15s once it is ready. A hand-rolled loop rather
+        # than the boto3 waiter so it can be told to stop if create() fails meanwhile.
+        def wait_nat_available(delay=5, max_attempts=120):
+            for _ in range(max_attempts):
+                try:
+                    state = ec2.describe_nat_gateways(NatGatewayIds=[nat_gw_id])["NatGateways"][0]["State"]
+                except ClientError as e:
+                    # a just-created NAT GW can briefly be unknown to Describe
+                    if e.response.get("Error", {}).get("Code") != "NatGatewayNotFound":
+                        raise
+                    state = "pending"
+                if state == "available":
+                    return
+                if state in ("failed", "deleting", "deleted"):
+                    raise RuntimeError(f"NAT GW {nat_gw_id} is {state}")
+                if stop.wait(delay):
+                    return
+            raise TimeoutError(f"NAT GW {nat_gw_id} not available after {delay * max_attempts}s")
+
+        nat_ready = ex.submit(wait_nat_available)
+
+        # 5. Route Tables
+        # Use main RTB as public (it already exists, so it is the one resource tagged after the fact)
+        ec2.create_tags(Resources=[main_rtb], Tags=[{"Key": "Name", "Value": f"{prefix}-main-RTB"}])
+        ec2.associate_route_table(RouteTableId=main_rtb, SubnetId=pub_subnet)
+        try:
+            ec2.create_route(RouteTableId=main_rtb, DestinationCidrBlock="0.0.0.0/0", GatewayId=igw_id)
+        except ClientError:
+            pass
+
+        # Private RTB (default route via NAT is added once the NAT GW is available)
+        rtb_pri = ec2.create_route_table(VpcId=vpc_id,
+                                         TagSpecifications=tagspec("route-table", f"{prefix}-rtb-private"))["RouteTable"]["RouteTableId"]
+        ec2.associate_route_table(RouteTableId=rtb_pri, SubnetId=pri_subnet)
+
+        print("RouteTables:", main_rtb, rtb_pri)
+
+        # 6. Security Groups
+        ec2.authorize_security_group_ingress(GroupId=sg_pub, IpPermissions=SSH_INGRESS)
+        print("SecurityGroup Public:", sg_pub)
+
+        ec2.authorize_security_group_ingress(GroupId=sg_pri, IpPermissions=[{
+            "IpProtocol": "tcp", "FromPort": 22, "ToPort": 22,
+            "UserIdGroupPairs": [{"GroupId": sg_pub}]
+        }])
+        print("SecurityGroup Private:", sg_pri)
+
+        # 7. Launch EC2 instances
+        # Different subnets/SGs rule out a single run_instances call, but the two
+        # launches are independent, so issue them on the pool side by side.
+        # Public EC2
+        fut_pub = ex.submit(ec2.run_instances, **BASE_RUN,
+                            KeyName=key_name, SubnetId=pub_subnet, SecurityGroupIds=[sg_pub],
+                            TagSpecifications=tagspec("instance", f"{prefix}-ec2-public"))
+
+        # Private EC2
+        def launch_private():
+            # Join the NAT waiter: the private subnet has no way out until this route exists
+            nat_ready.result()
+            if stop.is_set():  # create() already failed; don't launch into a half-built VPC
+                return None
+            try:
+                ec2.create_route(RouteTableId=rtb_pri, DestinationCidrBlock="0.0.0.0/0", NatGatewayId=nat_gw_id)
+            except ClientError:
+                pass
+            return ec2.run_instances(**BASE_RUN,
+                                     KeyName=key_name, SubnetId=pri_subnet, SecurityGroupIds=[sg_pri],
+                                     TagSpecifications=tagspec("instance", f"{prefix}-ec2-private"))
+
+        fut_pri = ex.submit(launch_private)
+        pub_run = fut_pub.result()["Instances"][0]
+        pri_run = fut_pri.result()["Instances"][0]
+    finally:
+        stop.set()
+        ex.shutdown(cancel_futures=True)
 
     print("EC2:", pub_run["InstanceId"], pri_run["InstanceId"])
 
@@ -149,34 +277,36 @@ def collect(args):
     region = args.region
     prefix = args.prefix
 
-    ec2 = boto3.client("ec2", region_name=region)
-    sts = boto3.client("sts", region_name=region)
-
-    # 1) caller identity
-    ident = sts.get_caller_identity()
-    write_json(f"{prefix}-caller-identity.json", ident)
-    print("Saved:", f"{prefix}-caller-identity.json")
+    ec2 = ec2_client(region)
 
-    # 2) find VPC by Name tag
-    vpcs = ec2.describe_vpcs(Filters=[{"Name":"tag:Name","Values":[f"{prefix}-vpc"]}])["Vpcs"]
-    if not vpcs:
-        raise SystemExit(f"No VPC with Name tag '{prefix}-vpc' found in region {region}.")
-    vpc_id = vpcs[0]["VpcId"]
-
-    # 3) instances (filtered by VPC)
-    inst = ec2.describe_instances(Filters=[{"Name":"vpc-id","Values":[vpc_id]}])
-    write_json(f"{prefix}-instances.json", inst)
-    print("Saved:", f"{prefix}-instances.json")
-
-    # 4) subnets (filtered by VPC)
-    subnets = ec2.describe_subnets(Filters=[{"Name":"vpc-id","Values":[vpc_id]}])
-    write_json(f"{prefix}-subnets.json", subnets)
-    print("Saved:", f"{prefix}-subnets.json")
+    # All five calls are pure network waits: run them on a pool and write each
+    # file as soon as its response arrives.
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        # 1) caller identity (independent of the VPC lookup); skipped entirely,
+        #    STS client included, with --no-include-identity
+        f_ident = ex.submit(sts_client(region).get_caller_identity) if args.include_identity else None
 
-    # 5) route tables (filtered by VPC)
-    rtb = ec2.describe_route_tables(Filters=[{"Name":"vpc-id","Values":[vpc_id]}])
-    write_json(f"{prefix}-route-tables.json", rtb)
-    print("Saved:", f"{prefix}-route-tables.json")
+        # 2) find VPC by Name tag
+        try:
+            vpc_id = resolve_vpc_id(region, prefix)
+        except LookupError:
+            if f_ident:
+                write_json(f"{prefix}-caller-identity.json", f_ident.result())
+                print("Saved:", f"{prefix}-caller-identity.json")
+            raise SystemExit(f"No VPC with Name tag '{prefix}-vpc' found in region {region}.")
+        vpc_filter = [{"Name":"vpc-id","Values":[vpc_id]}]
+
+        # 3-5) instances, subnets, route tables (filtered by VPC)
+        jobs = {
+            ex.submit(ec2.describe_instances, Filters=vpc_filter): f"{prefix}-instances.json",
+            ex.submit(ec2.describe_subnets, Filters=vpc_filter): f"{prefix}-subnets.json",
+            ex.submit(ec2.describe_route_tables, Filters=vpc_filter): f"{prefix}-route-tables.json",
+        }
+        if f_ident:
+            jobs[f_ident] = f"{prefix}-caller-identity.json"
+        for fut in as_completed(jobs):
+            write_json(jobs[fut], fut.result())
+            print("Saved:", jobs[fut])
 
     print("All outputs collected. Put them in GDoc in order: caller-identity → iid-public/private → subnets → route-tables.")
 
@@ -184,127 +314,146 @@ def collect(args):
 # ---------------- TEARDOWN ----------------
 
 def teardown(args):
+    from botocore.exceptions import BotoCoreError, ClientError
     region = args.region
     prefix = args.prefix
-    ec2 = boto3.client("ec2", region_name=region)
+    ec2 = ec2_client(region)
 
     def log(msg):  # simple logger
         print(msg, flush=True)
 
-    def try_do(msg, fn, **kw):
-        try:
-            out = fn(**kw)
+    def report(msg, out, ignore=GONE_CODES):
+        """Log one call's outcome; out is its result or the error safe() caught."""
+        if isinstance(out, BotoCoreError):
+            log(f"... {msg} -> {out}")
+            return
+        if not isinstance(out, ClientError):
             log(f"✓ {msg}")
-            return out
-        except ClientError as e:
-            err = e.response.get("Error", {}).get("Message", str(e))
-            log(f"... {msg} -> {err}")
-        except Exception as e:
-            log(f"... {msg} -> {e}")
+            return
+        err = out.response.get("Error", {})
+        if err.get("Code") in ignore:
+            log(f"✓ {msg} (already gone)")
+        else:
+            log(f"... {msg} -> {err.get('Message') or out}")
+
+    def try_do_idempotent(msg, fn, ignore=GONE_CODES, **kw):
+        out = safe(fn)(**kw)
+        report(msg, out, ignore)
+        return None if isinstance(out, (ClientError, BotoCoreError)) else out
 
     # --- Resolve VPC by Name tag -------------------------------------------------
-    vpcs = ec2.describe_vpcs(Filters=[{"Name": "tag:Name", "Values": [f"{prefix}-vpc"]}])["Vpcs"]
-    if not vpcs:
+    try:
+        vpc_id = resolve_vpc_id(region, prefix)
+    except LookupError:
         log(f"No VPC found with tag Name={prefix}-vpc in {region}. Nothing to do.")
         return
-    vpc_id = vpcs[0]["VpcId"]
     log(f"VPC: {vpc_id}")
 
     # --- 1) Terminate all instances in this VPC ----------------------------------
-    res = ec2.describe_instances(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])["Reservations"]
+    res = describe_all(ec2, "describe_instances", "Reservations", Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])
     inst_ids = [i["InstanceId"] for r in res for i in r.get("Instances", []) if i["State"]["Name"] != "terminated"]
     if inst_ids:
-        try_do(f"terminate instances {inst_ids}", ec2.terminate_instances, InstanceIds=inst_ids)
+        try_do_idempotent(f"terminate instances {inst_ids}", ec2.terminate_instances, InstanceIds=inst_ids)
         try:
-            ec2.get_waiter("instance_terminated").wait(InstanceIds=inst_ids)
+            ec2.get_waiter("instance_terminated").wait(InstanceIds=inst_ids,
+                                                       WaiterConfig={"Delay": 5, "MaxAttempts": 120})
             log("✓ instances terminated (waiter)")
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             log(f"... instance waiter -> {e}")
 
-    # --- 2) Delete NAT Gateways and wait -----------------------------------------
-    ngws = ec2.describe_nat_gateways(Filter=[{"Name": "vpc-id", "Values": [vpc_id]}])["NatGateways"]
-    for ngw in ngws:
-        ngw_id = ngw["NatGatewayId"]
-        try_do(f"delete NAT GW {ngw_id}", ec2.delete_nat_gateway, NatGatewayId=ngw_id)
-    if ngws:
-        try:
-            ec2.get_waiter("nat_gateway_deleted").wait(NatGatewayIds=[ngw["NatGatewayId"] for ngw in ngws])
-            log("✓ NAT GW(s) deleted (waiter)")
-        except ClientError as e:
-            log(f"... NAT GW waiter -> {e}")
-
-    # --- 3) Disassociate any public IPs/EIPs from ENIs in the VPC ----------------
-    nis = ec2.describe_network_interfaces(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])["NetworkInterfaces"]
-    for ni in nis:
-        assoc = ni.get("Association") or {}
-        assoc_id = assoc.get("AssociationId")
-        alloc_id = assoc.get("AllocationId")
-        pub_ip   = assoc.get("PublicIp")
-        if pub_ip:
-            if assoc_id:
-                try_do(f"disassociate address {assoc_id} from ENI {ni['NetworkInterfaceId']}",
-                       ec2.disassociate_address, AssociationId=assoc_id)
-            if alloc_id:
-                try_do(f"release EIP {alloc_id}", ec2.release_address, AllocationId=alloc_id)
-
-    # --- 4) Detach & delete Internet Gateways ------------------------------------
-    igws = ec2.describe_internet_gateways(Filters=[{"Name": "attachment.vpc-id", "Values": [vpc_id]}])["InternetGateways"]
-    for igw in igws:
-        igw_id = igw["InternetGatewayId"]
-        for att in igw.get("Attachments", []):
-            try_do(f"detach IGW {igw_id} from VPC {att['VpcId']}",
-                   ec2.detach_internet_gateway, InternetGatewayId=igw_id, VpcId=att["VpcId"])
-        try_do(f"delete IGW {igw_id}", ec2.delete_internet_gateway, InternetGatewayId=igw_id)
-
-    # --- 5) Disassociate & delete non-main route tables ---------------------------
-    rtbs = ec2.describe_route_tables(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])["RouteTables"]
-    for rtb in rtbs:
-        rtb_id = rtb["RouteTableId"]
-        is_main = any(a.get("Main") for a in rtb.get("Associations", []))
+    # Every mutation below is an independent HTTP round-trip, so each step fans
+    # its per-resource calls out over a pool and drains them before the next step
+    # starts (steps depend on each other, resources within a step don't).
+    # Results are logged from this thread as they complete.
+    ex = ThreadPoolExecutor(max_workers=16)
+
+    def phase(jobs):
+        """Run (msg, call) jobs concurrently, logging each outcome; block until all finish."""
+        futs = {ex.submit(safe(call)): msg for msg, call in jobs}
+        for fut in as_completed(futs):
+            report(futs[fut], fut.result())
+
+    try:
+        # --- 2) Delete NAT Gateways and wait -------------------------------------
+        ngws = describe_all(ec2, "describe_nat_gateways", "NatGateways", Filter=[{"Name": "vpc-id", "Values": [vpc_id]}])
+        phase((f"delete NAT GW {ngw['NatGatewayId']}",
+               partial(ec2.delete_nat_gateway, NatGatewayId=ngw["NatGatewayId"])) for ngw in ngws)
+        if ngws:
+            try:
+                ec2.get_waiter("nat_gateway_deleted").wait(NatGatewayIds=[ngw["NatGatewayId"] for ngw in ngws],
+                                                           WaiterConfig={"Delay": 10, "MaxAttempts": 60})
+                log("✓ NAT GW(s) deleted (waiter)")
+            except (ClientError, BotoCoreError) as e:
+                log(f"... NAT GW waiter -> {e}")
+
+        # --- 3) Disassociate & release public IPs/EIPs in the VPC ----------------
+        # Only ENIs carrying a public IP; the filter runs server-side
+        nis = describe_all(ec2, "describe_network_interfaces", "NetworkInterfaces",
+                           Filters=[{"Name": "vpc-id", "Values": [vpc_id]},
+                                    {"Name": "association.public-ip", "Values": ["*"]}])
+        assocs = [ni["Association"] | {"NetworkInterfaceId": ni["NetworkInterfaceId"]} for ni in nis]
+        phase((f"disassociate address {a['AssociationId']} from ENI {a['NetworkInterfaceId']}",
+               partial(ec2.disassociate_address, AssociationId=a["AssociationId"]))
+              for a in assocs if a.get("AssociationId"))
+        # Plus create()'s NAT EIP: it is left unassociated once the NAT GW is gone,
+        # so the ENI scan above can't see it; find it by its Name tag instead.
+        nat_eips = ec2.describe_addresses(Filters=[{"Name": "tag:Name", "Values": [f"{prefix}-eip"]}])["Addresses"]
+        alloc_ids = {a["AllocationId"] for a in assocs if a.get("AllocationId")} | {a["AllocationId"] for a in nat_eips}
+        phase((f"release EIP {alloc_id}", partial(ec2.release_address, AllocationId=alloc_id))
+              for alloc_id in sorted(alloc_ids))
+
+        # --- 4) Detach & delete Internet Gateways --------------------------------
+        igws = describe_all(ec2, "describe_internet_gateways", "InternetGateways", Filters=[{"Name": "attachment.vpc-id", "Values": [vpc_id]}])
+        phase((f"detach IGW {igw['InternetGatewayId']} from VPC {att['VpcId']}",
+               partial(ec2.detach_internet_gateway, InternetGatewayId=igw["InternetGatewayId"], VpcId=att["VpcId"]))
+              for igw in igws for att in igw.get("Attachments", []))
+        phase((f"delete IGW {igw['InternetGatewayId']}",
+               partial(ec2.delete_internet_gateway, InternetGatewayId=igw["InternetGatewayId"])) for igw in igws)
+
+        # --- 5) Disassociate & delete non-main route tables -----------------------
+        rtbs = describe_all(ec2, "describe_route_tables", "RouteTables", Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])
+        # Scan the associations once; the main RTB is the one that must be kept
+        main_rtbs = {rtb["RouteTableId"] for rtb in rtbs for a in rtb.get("Associations", ()) if a.get("Main")}
         # Disassociate all non-main associations first
-        for assoc in rtb.get("Associations", []):
-            if assoc.get("Main"):
-                continue
-            assoc_id = assoc.get("RouteTableAssociationId")
-            if assoc_id:
-                try_do(f"disassociate RTB {rtb_id} assoc {assoc_id}",
-                       ec2.disassociate_route_table, AssociationId=assoc_id)
+        phase((f"disassociate RTB {rtb['RouteTableId']} assoc {assoc['RouteTableAssociationId']}",
+               partial(ec2.disassociate_route_table, AssociationId=assoc["RouteTableAssociationId"]))
+              for rtb in rtbs for assoc in rtb.get("Associations", [])
+              if not assoc.get("Main") and assoc.get("RouteTableAssociationId"))
         # Remove 0.0.0.0/0 route if present (helps IGW/NAT dependencies)
-        for route in rtb.get("Routes", []):
-            if route.get("DestinationCidrBlock") == "0.0.0.0/0":
-                try_do(f"delete default route from {rtb_id}",
-                       ec2.delete_route, RouteTableId=rtb_id, DestinationCidrBlock="0.0.0.0/0")
+        phase((f"delete default route from {rtb['RouteTableId']}",
+               partial(ec2.delete_route, RouteTableId=rtb["RouteTableId"], DestinationCidrBlock="0.0.0.0/0"))
+              for rtb in rtbs
+              if any(route.get("DestinationCidrBlock") == "0.0.0.0/0" for route in rtb.get("Routes", [])))
         # Delete the RTB if it’s not main
-        if not is_main:
-            try_do(f"delete RTB {rtb_id}", ec2.delete_route_table, RouteTableId=rtb_id)
-
-    # --- 6) Delete subnets --------------------------------------------------------
-    subs = ec2.describe_subnets(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])["Subnets"]
-    # Ensure no leftover ENIs block subnet deletion
-    for sn in subs:
-        sn_id = sn["SubnetId"]
-        # extra safety: delete stray ENIs in this subnet (rare unless interface endpoints, etc.)
-        enis = ec2.describe_network_interfaces(Filters=[{"Name": "subnet-id", "Values": [sn_id]}])["NetworkInterfaces"]
-        for eni in enis:
-            # Must be detached to delete; skip if in-use
-            att = eni.get("Attachment")
-            if att and att.get("Status") == "attached":
-                # usually instances gone -> not expected here
-                try_do(f"detach ENI {eni['NetworkInterfaceId']} (may fail if system-managed)",
-                       ec2.detach_network_interface, AttachmentId=att["AttachmentId"], Force=True)
-            try_do(f"delete ENI {eni['NetworkInterfaceId']}", ec2.delete_network_interface,
-                   NetworkInterfaceId=eni["NetworkInterfaceId"])
-        try_do(f"delete subnet {sn_id}", ec2.delete_subnet, SubnetId=sn_id)
-
-    # --- 7) Delete non-default Security Groups -----------------------------------
-    sgs = ec2.describe_security_groups(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])["SecurityGroups"]
-    for sg in sgs:
-        if sg.get("GroupName") == "default":
-            continue
-        try_do(f"delete SG {sg['GroupId']}", ec2.delete_security_group, GroupId=sg["GroupId"])
+        phase((f"delete RTB {rtb['RouteTableId']}", partial(ec2.delete_route_table, RouteTableId=rtb["RouteTableId"]))
+              for rtb in rtbs if rtb["RouteTableId"] not in main_rtbs)
+
+        # --- 6) Delete subnets ----------------------------------------------------
+        subs = describe_all(ec2, "describe_subnets", "Subnets", Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])
+        # Delete stray ENIs first so they don't block subnet deletion (one Describe, grouped by subnet)
+        enis_by_subnet = defaultdict(list)
+        for ni in describe_all(ec2, "describe_network_interfaces", "NetworkInterfaces",
+                               Filters=[{"Name": "vpc-id", "Values": [vpc_id]}]):
+            enis_by_subnet[ni.get("SubnetId")].append(ni)
+        enis = [eni for sn in subs for eni in enis_by_subnet.get(sn["SubnetId"], [])]
+        # Must be detached to delete; usually instances gone -> not expected here
+        phase((f"detach ENI {eni['NetworkInterfaceId']} (may fail if system-managed)",
+               partial(ec2.detach_network_interface, AttachmentId=eni["Attachment"]["AttachmentId"], Force=True))
+              for eni in enis if (eni.get("Attachment") or {}).get("Status") == "attached")
+        phase((f"delete ENI {eni['NetworkInterfaceId']}",
+               partial(ec2.delete_network_interface, NetworkInterfaceId=eni["NetworkInterfaceId"])) for eni in enis)
+        phase((f"delete subnet {sn['SubnetId']}", partial(ec2.delete_subnet, SubnetId=sn["SubnetId"])) for sn in subs)
+
+        # --- 7) Delete non-default Security Groups -------------------------------
+        sgs = describe_all(ec2, "describe_security_groups", "SecurityGroups", Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])
+        phase((f"delete SG {sg['GroupId']}", partial(ec2.delete_security_group, GroupId=sg["GroupId"]))
+              for sg in sgs if sg.get("GroupName") != "default")
+    finally:
+        # also on a deliberately re-raised non-AWS error, so no worker outlives teardown
+        ex.shutdown(cancel_futures=True)
 
     # --- 8) Delete the VPC --------------------------------------------------------
-    try_do(f"delete VPC {vpc_id}", ec2.delete_vpc, VpcId=vpc_id)
+    try_do_idempotent(f"delete VPC {vpc_id}", ec2.delete_vpc, VpcId=vpc_id)
 
     log("teardown complete.")
 
@@ -323,6 +472,8 @@ def parse_args():
     pg = sub.add_parser("collect", help="export JSON files required by the homework")
     pg.add_argument("--region", required=True)
     pg.add_argument("--prefix", required=True)
+    pg.add_argument("--include-identity", action=argparse.BooleanOptionalAction, default=True,
+                    help="also export <prefix>-caller-identity.json (STS call)")
     pg.set_defaults(func=collect)
 
     pt = sub.add_parser("teardown", help="destroy all resources created by this script")